@@ -1,69 +1,474 @@
+import asyncio
+import base64
+import functools
+import hashlib
+import itertools
 import os
+import re
+import struct
+from datetime import date, datetime
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+import orjson
+import pyarrow as pa
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
+import threading
 import time
+import diskcache
+from cachetools import LRUCache, TTLCache, cachedmethod
+from cachetools.keys import hashkey
 from databricks.sdk import WorkspaceClient
-from databricks.sdk.service.sql import StatementState
+from databricks.sdk.config import Config
+from databricks.sdk.service.sql import (
+    ColumnInfoTypeName,
+    Disposition,
+    ExecuteStatementRequestOnWaitTimeout,
+    Format,
+    StatementParameterListItem,
+    StatementState,
+)
 
-load_dotenv()
+# Parse .env only once per process, even when main is imported by tests or an MCP host
+if not os.getenv("_DOTENV_LOADED"):
+    load_dotenv()
+    os.environ["_DOTENV_LOADED"] = "1"
+
+# Shared, pooled HTTP session for downloading result chunks from presigned URLs
+_HTTP_SESSION = requests.Session()
+_HTTP_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+def _download_arrow_chunk(link) -> pa.Table:
+    """Download a single Arrow IPC result chunk from its presigned URL."""
+    with _HTTP_SESSION.get(link.external_link, headers=link.http_headers, stream=True) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        return pa.ipc.open_stream(response.raw).read_all()
+
+# Time-to-live (seconds) for cached catalog/schema/table metadata
+META_CACHE_TTL = float(os.getenv("DATABRICKS_MCP_META_TTL", "60"))
+
+# Persistent cache for table descriptions, shared across server restarts
+DESCRIBE_CACHE_TTL = float(os.getenv("DATABRICKS_MCP_DESCRIBE_TTL", "600"))
+
+@functools.lru_cache(maxsize=None)
+def _describe_cache() -> diskcache.Cache:
+    """Open the on-disk description cache on first use rather than at import."""
+    cache = diskcache.Cache(
+        os.getenv("DATABRICKS_MCP_CACHE_DIR", os.path.expanduser("~/.cache/databricks-mcp"))
+    )
+    cache.create_tag_index()  # Entries are evicted per credential tag
+    return cache
+
+# Statements that may change table metadata (leading SQL comments are skipped)
+_DDL_PATTERN = re.compile(
+    r"^\s*(?:(?:--[^\n]*(?:\n|$)|/\*.*?\*/)\s*)*(ALTER|CREATE|DROP|REPLACE|TRUNCATE)\b",
+    re.IGNORECASE | re.DOTALL
+)
+
+def _cached_metadata(method):
+    """Cache a read-only metadata method in the instance's TTL cache, keyed by method name and arguments."""
+    return cachedmethod(
+        lambda self: self._meta_cache,
+        key=lambda self, *args, **kwargs: hashkey(method.__name__, *args, **kwargs),
+        lock=lambda self: self._meta_lock
+    )(method)
+
+# Maximum number of prebuilt INSERT statements kept per client
+INSERT_TEMPLATE_CACHE_SIZE = 64
+
+# SQL parameter types inferred from Python values; anything else is bound as STRING
+_SQL_TYPES = {bool: "BOOLEAN", int: "BIGINT", float: "DOUBLE", str: "STRING"}
+
+# Statement polling parameters (only used for long-running statements)
+POLL_TIMEOUT = 60  # Maximum wait time in seconds
+POLL_INITIAL_INTERVAL = 0.1  # Initial polling interval in seconds
+POLL_MAX_INTERVAL = 2.0  # Upper bound for the backoff
+IN_FLIGHT_STATES = (StatementState.PENDING, StatementState.RUNNING)
+ASYNC_WAIT_TIMEOUT = "0s"  # Async statements return immediately and are polled by the StatementReaper
+
+# Results with more rows or bytes than this are fetched as Arrow instead of inline JSON;
+# the byte limit stays well under the 25 MiB at which INLINE statements fail outright
+INLINE_ROW_LIMIT = 10000
+INLINE_BYTE_LIMIT = 16 * 1024 * 1024
+
+def _parse_float32(val: str) -> float:
+    """Parse a FLOAT value rounded to single precision, as Arrow's float32 columns yield it."""
+    return struct.unpack("f", struct.pack("f", float(val)))[0]
+
+# Inline JSON results carry every value as a string; convert them to the Python types
+# the Arrow path yields. Nested types are decoded from their JSON text, so their
+# elements keep JSON types (e.g. dates stay strings) and maps come back as dicts
+# rather than Arrow's list of (key, value) pairs. BINARY stays base64 text, which unlike
+# raw bytes serializes to JSON; other types (e.g. INTERVAL) stay strings.
+_INLINE_CONVERTERS = {
+    ColumnInfoTypeName.BYTE: int,
+    ColumnInfoTypeName.SHORT: int,
+    ColumnInfoTypeName.INT: int,
+    ColumnInfoTypeName.LONG: int,
+    ColumnInfoTypeName.FLOAT: _parse_float32,
+    ColumnInfoTypeName.DOUBLE: float,
+    ColumnInfoTypeName.DECIMAL: Decimal,
+    ColumnInfoTypeName.BOOLEAN: lambda val: val == "true",
+    ColumnInfoTypeName.DATE: date.fromisoformat,
+    ColumnInfoTypeName.TIMESTAMP: lambda val: datetime.fromisoformat(val.replace("Z", "+00:00")),
+    ColumnInfoTypeName.ARRAY: orjson.loads,
+    ColumnInfoTypeName.MAP: orjson.loads,
+    ColumnInfoTypeName.STRUCT: orjson.loads,
+}
+
+def _table_to_rows(table) -> list:
+    """Convert a pyarrow Table into a list of row tuples; None yields no rows."""
+    if table is None:
+        return []  # No results for statements like CREATE TABLE
+    return list(zip(*(_column_to_pylist(column) for column in table.columns)))
+
+def _column_to_pylist(column) -> list:
+    """Convert a pyarrow column to Python values, base64-encoding binary ones as the inline path does."""
+    values = column.to_pylist()
+    if pa.types.is_binary(column.type) or pa.types.is_large_binary(column.type):
+        return [None if val is None else base64.b64encode(val).decode("ascii") for val in values]
+    return values
+
+def _orjson_response_hook(response, *args, **kwargs):
+    """Make response.json() decode with orjson instead of the stdlib json module."""
+    response.json = lambda **_: orjson.loads(response.content)
+    return response
+
+def _cancel_statement(client, statement_id: str):
+    """Best-effort cancel of a statement nobody is waiting for, so it stops using the warehouse."""
+    try:
+        client.statement_execution.cancel_execution(statement_id)
+    except Exception:
+        pass  # The caller's timeout or cancellation is the error worth reporting
+
+class StatementReaper:
+    """Poll every in-flight statement from one background task and resolve their futures.
+
+    Each statement keeps its own exponential backoff, but all polls due on the
+    same tick are issued together instead of every caller running its own loop.
+    """
+
+    def __init__(self, client, tick: float = POLL_INITIAL_INTERVAL):
+        self.client = client
+        self.tick = tick
+        self._pending = {}  # statement_id -> [future, next poll time, current backoff]
+        self._task = None
+
+    async def wait(self, statement_id: str, timeout: float = POLL_TIMEOUT):
+        """Wait until the statement leaves the PENDING/RUNNING states and return its response."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[statement_id] = [future, loop.time() + POLL_INITIAL_INTERVAL, POLL_INITIAL_INTERVAL]
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            loop.run_in_executor(None, _cancel_statement, self.client, statement_id)
+            raise Exception("SQL execution timed out")
+        except asyncio.CancelledError:
+            # Fire and forget: a cancelled task should not block on the cancel request
+            loop.run_in_executor(None, _cancel_statement, self.client, statement_id)
+            raise
+        finally:
+            self._pending.pop(statement_id, None)
+
+    async def _run(self):
+        """Reap completed statements until none are left pending."""
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            await asyncio.sleep(self.tick)
+            now = loop.time()
+            due = [sid for sid, (future, next_poll, _) in self._pending.items()
+                   if next_poll <= now and not future.done()]
+            responses = await asyncio.gather(
+                *(asyncio.to_thread(self.client.statement_execution.get_statement, sid) for sid in due),
+                return_exceptions=True
+            )
+            for sid, response in zip(due, responses):
+                entry = self._pending.get(sid)
+                if entry is None or entry[0].done():
+                    continue  # The caller already gave up (e.g. timed out)
+                if isinstance(response, BaseException):
+                    entry[0].set_exception(response)
+                    continue
+                # A malformed response must fail only its own statement, not the shared task
+                try:
+                    if response.status.state in IN_FLIGHT_STATES:
+                        entry[2] = min(entry[2] * 2, POLL_MAX_INTERVAL)
+                        entry[1] = loop.time() + entry[2]
+                    else:
+                        entry[0].set_result(response)
+                except Exception as e:
+                    entry[0].set_exception(e)
+
+async def _download_arrow_chunks_async(links) -> pa.Table:
+    """Download Arrow IPC result chunks concurrently over HTTP/2 and concatenate them."""
+    transport = httpx.AsyncHTTPTransport(http2=True, retries=3, limits=httpx.Limits(max_connections=32))
+    async with httpx.AsyncClient(transport=transport, timeout=30.0) as client:
+        responses = await asyncio.gather(
+            *(client.get(link.external_link, headers=link.http_headers) for link in links)
+        )
+    for response in responses:
+        response.raise_for_status()
+    # Decode off the event loop; pyarrow releases the GIL while reading IPC streams
+    return await asyncio.to_thread(
+        lambda: pa.concat_tables([pa.ipc.open_stream(response.content).read_all() for response in responses])
+    )
 
 class DatabricksMCP:
     def __init__(self, host: str, token: str, warehouse_id: str):
         """Initialize the Databricks client with host, token, and warehouse ID."""
-        self.client = WorkspaceClient(host=host, token=token)
+        self.client = WorkspaceClient(config=Config(
+            host=host,
+            token=token,
+            http_timeout_seconds=30,
+            retry_timeout_seconds=60,
+            max_connections_per_pool=32
+        ))
+        # The SDK decodes every REST response via requests' Response.json() on the
+        # session owned by its internal _BaseClient; hook that session so the
+        # decoding goes through orjson. Skipped if the SDK internals change.
+        session = getattr(getattr(self.client.api_client, "_api_client", None), "_session", None)
+        if session is not None:
+            session.hooks["response"].append(_orjson_response_hook)
+        # Identifies these credentials in shared caches without keeping the raw token
+        self._identity = (host, hashlib.sha256(token.encode()).hexdigest())
+        self._cache_tag = "|".join(self._identity)
         self.warehouse_id = warehouse_id
+        self._meta_cache = TTLCache(maxsize=1024, ttl=META_CACHE_TTL)
+        self._meta_lock = threading.Lock()
+        self._reaper = StatementReaper(self.client)
+        # (table, rows, columns) -> (INSERT sql, parameter names); bounded since every
+        # distinct final-page size adds an entry
+        self._insert_templates = LRUCache(maxsize=INSERT_TEMPLATE_CACHE_SIZE)
+        self._insert_lock = threading.Lock()
 
-    def execute_sql_query(self, sql: str) -> list:
-        """Execute a SQL query and return the results as a list of rows if applicable."""
-        # Submit the SQL statement
-        response = self.client.statement_execution.execute_statement(
+    def _invalidate_metadata(self, method_name: str, *args):
+        """Drop a cached metadata entry after a mutating call."""
+        with self._meta_lock:
+            self._meta_cache.pop(hashkey(method_name, *args), None)
+
+    def _invalidate_after(self, sql: str):
+        """Drop all cached metadata for these credentials if the statement was DDL."""
+        if _DDL_PATTERN.match(sql):
+            with self._meta_lock:
+                self._meta_cache.clear()
+            _describe_cache().evict(self._cache_tag)
+
+    def _submit_statement(self, sql: str, parameters: list = None, arrow: bool = True, row_limit: int = None,
+                          byte_limit: int = None, wait_timeout: str = "30s"):
+        """Submit a SQL statement and return the initial response.
+
+        With arrow=True results are delivered as Arrow chunks behind presigned
+        links; otherwise they are returned inline as JSON arrays.
+        """
+        # The server blocks up to wait_timeout ("0s" returns at once) and returns
+        # the result directly when the statement finishes quickly
+        return self.client.statement_execution.execute_statement(
             warehouse_id=self.warehouse_id,
-            statement=sql
+            statement=sql,
+            parameters=parameters,
+            row_limit=row_limit,
+            byte_limit=byte_limit,
+            wait_timeout=wait_timeout,
+            on_wait_timeout=ExecuteStatementRequestOnWaitTimeout.CONTINUE,
+            format=Format.ARROW_STREAM if arrow else Format.JSON_ARRAY,
+            disposition=Disposition.EXTERNAL_LINKS if arrow else Disposition.INLINE
         )
-        statement_id = response.statement_id
 
-        # Polling parameters
-        timeout = 60  # Maximum wait time in seconds
-        interval = 5  # Polling interval in seconds
+    @staticmethod
+    def _check_terminal_state(response):
+        """Return a finished statement's response, raising if it did not succeed."""
+        state = response.status.state
+        if state == StatementState.SUCCEEDED:
+            return response
+        elif state == StatementState.FAILED:
+            error = response.status.error
+            raise Exception(f"SQL execution failed: {error.message if error else 'unknown error'}")
+        elif state == StatementState.CANCELED:
+            raise Exception("SQL execution was canceled")
+        else:
+            raise Exception(f"Unexpected statement state: {state}")
+
+    def _execute_statement(self, sql: str, parameters: list = None, arrow: bool = True, row_limit: int = None,
+                           byte_limit: int = None):
+        """Submit a SQL statement, wait for it to finish and return the final response."""
+        response = self._submit_statement(sql, parameters, arrow, row_limit, byte_limit)
+        interval = POLL_INITIAL_INTERVAL
         start_time = time.time()
 
-        # Poll the statement status
-        while time.time() - start_time < timeout:
-            status_response = self.client.statement_execution.get_statement(statement_id)
-            state = status_response.status.state
-
-            if state == StatementState.SUCCEEDED:
-                # For SELECT queries, return the data; for DDL like CREATE TABLE, return empty list
-                if status_response.result and status_response.result.data_array:
-                    return [list(row) for row in status_response.result.data_array]
-                return []  # No results for statements like CREATE TABLE
-            elif state == StatementState.FAILED:
-                raise Exception(f"SQL execution failed")
-            elif state == StatementState.CANCELED:
-                raise Exception("SQL execution was canceled")
-            else:
-                raise Exception(f"Unexpected statement state: {state}")
-
-        # If polling exceeds timeout, raise an exception
-        raise Exception("SQL execution timed out")
+        # Poll with exponential backoff while the statement is still in flight
+        while response.status.state in IN_FLIGHT_STATES:
+            if time.time() - start_time >= POLL_TIMEOUT:
+                _cancel_statement(self.client, response.statement_id)
+                raise Exception("SQL execution timed out")
+            time.sleep(interval)
+            interval = min(interval * 2, POLL_MAX_INTERVAL)
+            response = self.client.statement_execution.get_statement(response.statement_id)
+
+        response = self._check_terminal_state(response)
+        self._invalidate_after(sql)
+        return response
+
+    async def _execute_statement_async(self, sql: str, parameters: list = None, arrow: bool = True,
+                                       row_limit: int = None, byte_limit: int = None):
+        """Async variant of _execute_statement; in-flight statements are polled by the shared reaper."""
+        # Submit without a server-side wait so no thread is held while the statement runs
+        response = await asyncio.to_thread(
+            self._submit_statement, sql, parameters, arrow, row_limit, byte_limit, ASYNC_WAIT_TIMEOUT
+        )
+        if response.status.state in IN_FLIGHT_STATES:
+            response = await self._reaper.wait(response.statement_id)
+        response = self._check_terminal_state(response)
+        await asyncio.to_thread(self._invalidate_after, sql)
+        return response
+
+    def _iter_links(self, response):
+        """Yield the presigned link of every result chunk, fetching further links lazily."""
+        if not response.result or not response.result.external_links:
+            return
+        links = response.result.external_links
+        while links:
+            yield from links
+            next_chunk_index = links[-1].next_chunk_index
+            if next_chunk_index is None:
+                return
+            links = self.client.statement_execution.get_statement_result_chunk_n(
+                response.statement_id, next_chunk_index
+            ).external_links
+
+    def _read_arrow(self, response):
+        """Download every result chunk of a finished statement into a pyarrow Table.
+
+        Returns None for statements that produce no result set (e.g. CREATE TABLE).
+        """
+        links = list(self._iter_links(response))
+        if not links:
+            return None
+
+        # Download the chunks in parallel straight from cloud storage
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            tables = list(executor.map(_download_arrow_chunk, links))
+        return pa.concat_tables(tables)
 
+    def _read_inline(self, response) -> list:
+        """Collect the rows of an inline JSON result, converting values to their column types."""
+        manifest = response.manifest
+        if not response.result or not manifest or not manifest.schema or manifest.total_row_count == 0:
+            return []  # No results for statements like CREATE TABLE
+        converters = [_INLINE_CONVERTERS.get(c.type_name, str) for c in response.manifest.schema.columns]
+        rows = []
+        result = response.result
+        while True:
+            rows.extend(
+                tuple(None if val is None else convert(val) for convert, val in zip(converters, row))
+                for row in result.data_array or []
+            )
+            if result.next_chunk_index is None:
+                return rows
+            result = self.client.statement_execution.get_statement_result_chunk_n(
+                response.statement_id, result.next_chunk_index
+            )
+
+    @staticmethod
+    def _fits_inline(response) -> bool:
+        """Whether an inline response holds the complete result set."""
+        manifest = response.manifest
+        if manifest is None:
+            return True
+        return not manifest.truncated and (manifest.total_row_count or 0) <= INLINE_ROW_LIMIT
+
+    async def _read_arrow_async(self, response):
+        """Async variant of _read_arrow that downloads the chunks over a multiplexed HTTP/2 client."""
+        links = await asyncio.to_thread(lambda: list(self._iter_links(response)))
+        if not links:
+            return None
+        return await _download_arrow_chunks_async(links)
+
+    def fetch_arrow(self, sql: str, parameters: list = None):
+        """Execute a SQL query and return the results as a pyarrow Table.
+
+        Returns None for statements that produce no result set (e.g. CREATE TABLE).
+        """
+        return self._read_arrow(self._execute_statement(sql, parameters))
+
+    def execute_sql_query(self, sql: str, parameters: list = None, prefer_arrow: bool = False) -> list:
+        """Execute a SQL query and return the results as a list of rows if applicable.
+
+        Named markers in the SQL (e.g. :name) are bound from parameters, a list of
+        StatementParameterListItem. Results within INLINE_ROW_LIMIT rows and
+        INLINE_BYTE_LIMIT bytes are read inline as JSON; larger results (or
+        prefer_arrow=True) are re-fetched as Arrow.
+        """
+        if not prefer_arrow:
+            response = self._execute_statement(
+                sql, parameters, arrow=False, row_limit=INLINE_ROW_LIMIT, byte_limit=INLINE_BYTE_LIMIT
+            )
+            if self._fits_inline(response):
+                return self._read_inline(response)
+        return _table_to_rows(self.fetch_arrow(sql, parameters))
+
+    def execute_sql_no_result(self, sql: str, parameters: list = None):
+        """Execute a DDL/DML statement, discarding whatever result it produces."""
+        self._execute_statement(sql, parameters, arrow=False)
+
+    def iter_sql_query(self, sql: str, parameters: list = None):
+        """Execute a SQL query and lazily yield its rows as tuples.
+
+        Result chunks are downloaded one at a time, so memory is bounded by a single chunk.
+        """
+        response = self._execute_statement(sql, parameters)
+        for link in self._iter_links(response):
+            yield from _table_to_rows(_download_arrow_chunk(link))
+
+    async def execute_sql_query_async(self, sql: str, parameters: list = None, prefer_arrow: bool = False) -> list:
+        """Async variant of execute_sql_query that does not block the event loop."""
+        if not prefer_arrow:
+            response = await self._execute_statement_async(
+                sql, parameters, arrow=False, row_limit=INLINE_ROW_LIMIT, byte_limit=INLINE_BYTE_LIMIT
+            )
+            if self._fits_inline(response):
+                return await asyncio.to_thread(self._read_inline, response)
+        response = await self._execute_statement_async(sql, parameters)
+        table = await self._read_arrow_async(response)
+        return _table_to_rows(table)
+
+    @_cached_metadata
     def list_catalogs(self) -> list:
         """List all catalogs in the workspace."""
         catalogs = self.client.catalogs.list()
         return [c.name for c in catalogs]
 
+    @_cached_metadata
     def list_schemas(self, catalog: str) -> list:
         """List all schemas in a given catalog."""
         schemas = self.client.schemas.list(catalog_name=catalog)
         return [s.name for s in schemas]
 
+    @_cached_metadata
     def list_tables(self, catalog: str, schema: str) -> list:
         """List all tables in a given schema."""
         tables = self.client.tables.list(catalog_name=catalog, schema_name=schema)
         return [t.name for t in tables]
 
+    def list_tables_bulk(self, catalog: str, schemas: list) -> dict:
+        """List the tables of several schemas in parallel, keyed by schema name."""
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            return dict(zip(schemas, executor.map(lambda s: self.list_tables(catalog, s), schemas)))
+
+    @_cached_metadata
     def describe_table(self, catalog: str, schema: str, table: str) -> dict:
-        """Describe the schema of a given table using SQL.
+        """Describe the schema of a given table using the Unity Catalog metadata API.
 
         Args:
             catalog (str): The catalog name.
@@ -73,94 +478,232 @@ class DatabricksMCP:
         Returns:
             dict: A dictionary with 'columns' (list of column names) and 'data_types' (list of data types).
         """
-        # Construct the fully qualified table name
-        table_full_name = f"{catalog}.{schema}.{table}"
-        # SQL query to describe the table
-        sql = f"DESCRIBE TABLE {table_full_name}"
-        # Execute the query using the existing method
-        result = self.execute_sql_query(sql)
-        # Extract column names and data types from the result
-        columns = [row[0] for row in result]
-        data_types = [row[1].upper() for row in result]
+        # Serve from the on-disk cache when a previous session already described the table
+        key = (*self._identity, catalog, schema, table)
+        description = _describe_cache().get(key)
+        if description is not None:
+            return description
+
+        # Fetch the table metadata directly; no SQL warehouse is involved
+        table_info = self.client.tables.get(full_name=f"{catalog}.{schema}.{table}")
+        columns = table_info.columns or []
+        description = {
+            "columns": [c.name for c in columns],
+            "data_types": [c.type_text.upper() for c in columns]
+        }
+        _describe_cache().set(key, description, expire=DESCRIBE_CACHE_TTL, tag=self._cache_tag)
         # Return the schema as a dictionary
-        return {"columns": columns, "data_types": data_types}
+        return description
+
+    def describe_tables_bulk(self, catalog: str, schema: str, tables: list) -> dict:
+        """Describe several tables of a schema in parallel, keyed by table name."""
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            return dict(zip(tables, executor.map(lambda t: self.describe_table(catalog, schema, t), tables)))
 
     def create_schema(self, catalog: str, schema: str):
         """Create a new schema in a given catalog."""
         self.client.schemas.create(name=schema, catalog_name=catalog)
+        self._invalidate_metadata("list_schemas", catalog)
 
     def create_table(self, catalog: str, schema: str, table: str, columns: list):
-        """Create a new table with specified columns."""
+        """Create a new table with specified columns.
+
+        Unlike the other metadata operations this goes through the SQL warehouse:
+        the Unity Catalog tables API only registers external tables and cannot
+        create managed Delta tables.
+        """
         table_full_name = f"{catalog}.{schema}.{table}"
         column_defs = [f"{col['name']} {col['type']}" for col in columns]
         sql = f"CREATE TABLE {table_full_name} ({', '.join(column_defs)})"
-        self.execute_sql_query(sql)
-
-    def insert_data(self, table_full_name: str, values: list):
-        """Insert data into a table (using literals for simplicity)."""
-        def format_value(val):
-            if isinstance(val, str):
-                return f"'{val}'"  # Quote strings
-            else:
-                return str(val)    # Convert non-strings (e.g., int) to string without quotes
-        
-        values_str = ", ".join([f"({', '.join(map(format_value, row))})" for row in values])
-        sql = f"INSERT INTO {table_full_name} VALUES {values_str}"
-        self.execute_sql_query(sql)
+        self.execute_sql_no_result(sql)  # Clears cached metadata, as for any DDL
+
+    @cachedmethod(lambda self: self._insert_templates, lock=lambda self: self._insert_lock)
+    def _insert_template(self, table_full_name: str, nrows: int, ncols: int):
+        """Return the cached parameterized INSERT statement and its flat list of parameter names."""
+        names = [f"p{i}_{j}" for i in range(nrows) for j in range(ncols)]
+        rows_sql = ", ".join(
+            "(" + ", ".join(":" + name for name in names[i * ncols:(i + 1) * ncols]) + ")"
+            for i in range(nrows)
+        )
+        return f"INSERT INTO {table_full_name} VALUES {rows_sql}", names
+
+    def insert_data(self, table_full_name: str, values: list, page_size: int = 500):
+        """Insert data into a table using named statement parameters.
+
+        Rows are sent in batches of at most page_size rows per INSERT statement.
+        """
+        for start in range(0, len(values), page_size):
+            batch = values[start:start + page_size]
+            ncols = len(batch[0])
+            if any(len(row) != ncols for row in batch):
+                raise ValueError("All rows must have the same number of columns")
+            sql, names = self._insert_template(table_full_name, len(batch), ncols)
+            # Bind every cell in one comprehension; a None value binds NULL
+            cells = itertools.chain.from_iterable(batch)
+            parameters = [
+                StatementParameterListItem(
+                    name=name,
+                    value=None if val is None else str(val),
+                    type=None if val is None else _SQL_TYPES.get(type(val), "STRING")
+                )
+                for name, val in zip(names, cells)
+            ]
+            self.execute_sql_no_result(sql, parameters)
 
 # Initialize MCP server
 mcp = FastMCP("Databricks MCP Server")
 
 # Load Databricks credentials from environment
-host = os.getenv("DATABRICKS_HOST")
-token = os.getenv("DATABRICKS_TOKEN")
-warehouse_id = os.getenv("DATABRICKS_WAREHOUSE_ID")
+# Unset and empty values are both rejected, naming the first one missing
+for name in ("DATABRICKS_HOST", "DATABRICKS_TOKEN", "DATABRICKS_WAREHOUSE_ID"):
+    if not os.environ.get(name):
+        raise ValueError(f"Missing required environment variable: {name}")
+host = os.environ["DATABRICKS_HOST"]
+token = os.environ["DATABRICKS_TOKEN"]
+warehouse_id = os.environ["DATABRICKS_WAREHOUSE_ID"]
+
+def _normalize_host(value: str) -> str:
+    """Canonical form of a workspace host for comparison: lowercase, https:// scheme, no trailing slash."""
+    value = value.strip().lower().rstrip("/")
+    return value if "://" in value else f"https://{value}"
+
+# Hosts callers may target via X-Databricks-Host (comma-separated); the configured host is always allowed
+ALLOWED_HOSTS = frozenset(
+    _normalize_host(h) for h in [host, *os.getenv("DATABRICKS_MCP_ALLOWED_HOSTS", "").split(",")] if h.strip()
+)
+
+# Creating a client resolves host metadata over the network, which can block for the SDK's
+# whole retry budget; run it on its own small pool and give up after this many seconds
+CLIENT_INIT_TIMEOUT = float(os.getenv("DATABRICKS_MCP_CLIENT_INIT_TIMEOUT", "10"))
+_CLIENT_INIT_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="databricks-client-init")
 
-if not all([host, token, warehouse_id]):
-    raise ValueError("Missing required environment variables: DATABRICKS_HOST, DATABRICKS_TOKEN, DATABRICKS_WAREHOUSE_ID")
+# One DatabricksMCP per set of credentials, keyed by (host, token hash, warehouse ID),
+# plus the creations still in flight so concurrent callers share a single one
+_CLIENTS = LRUCache(maxsize=64)
+_PENDING_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
 
-databricks = DatabricksMCP(host, token, warehouse_id)
+def _client_key(host: str, token: str, warehouse_id: str) -> tuple:
+    """Cache key for a credential set, without keeping the raw token."""
+    return (host, hashlib.sha256(token.encode()).hexdigest(), warehouse_id)
+
+def get_client(host: str, token: str, warehouse_id: str) -> DatabricksMCP:
+    """Return the cached DatabricksMCP for these credentials, creating it on first use."""
+    key = _client_key(host, token, warehouse_id)
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+    if client is None:
+        client = DatabricksMCP(host, token, warehouse_id)
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.setdefault(key, client)
+    return client
+
+async def _client_for(ctx: Context) -> DatabricksMCP:
+    """Resolve the client for a tool call.
+
+    Over HTTP transports, callers may supply their own credentials with the
+    X-Databricks-Host, X-Databricks-Token and X-Databricks-Warehouse-Id headers;
+    anything not supplied falls back to the environment. Only hosts in
+    ALLOWED_HOSTS are accepted.
+    """
+    request = ctx.request_context.request
+    headers = request.headers if request is not None else {}
+    if "x-databricks-host" in headers:
+        if "x-databricks-token" not in headers:
+            # Never send the server's own token to a caller-chosen host
+            raise ValueError("X-Databricks-Host requires X-Databricks-Token")
+        if _normalize_host(headers["x-databricks-host"]) not in ALLOWED_HOSTS:
+            raise ValueError(f"Host not allowed: {headers['x-databricks-host']}")
+    # The host is normalized so spelling variants share one client and one set of cache entries
+    credentials = (
+        _normalize_host(headers.get("x-databricks-host", host)),
+        headers.get("x-databricks-token", token),
+        headers.get("x-databricks-warehouse-id", warehouse_id)
+    )
+    key = _client_key(*credentials)
+    # Cached clients are returned straight away; only new ones wait on the init pool
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is not None:
+            return client
+        future = _PENDING_CLIENTS.get(key)
+        if future is None:
+            future = _PENDING_CLIENTS[key] = _CLIENT_INIT_EXECUTOR.submit(get_client, *credentials)
+            future.add_done_callback(lambda _: _forget_pending_client(key))
+    try:
+        # Shielded so one caller timing out does not cancel the creation for the others
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), CLIENT_INIT_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Timed out connecting to {credentials[0]}") from None
+
+def _forget_pending_client(key: tuple):
+    """Stop sharing a finished client creation; failures are retried by the next caller."""
+    with _CLIENTS_LOCK:
+        _PENDING_CLIENTS.pop(key, None)
 
 # Register Databricks methods as MCP tools
 @mcp.tool()
-def execute_sql_query(sql: str) -> list:
-    """Execute a SQL query on Databricks and return results as a list of rows."""
-    return databricks.execute_sql_query(sql)
+async def execute_sql_query(sql: str, ctx: Context, prefer_arrow: bool = False) -> list:
+    """Execute a SQL query on Databricks and return results as a list of rows.
+
+    Set prefer_arrow for queries expected to return large results.
+    """
+    databricks = await _client_for(ctx)
+    return await databricks.execute_sql_query_async(sql, prefer_arrow=prefer_arrow)
 
 @mcp.tool()
-def list_catalogs() -> list:
+async def list_catalogs(ctx: Context) -> list:
     """List all catalogs in the Databricks workspace."""
-    return databricks.list_catalogs()
+    databricks = await _client_for(ctx)
+    return await asyncio.to_thread(databricks.list_catalogs)
 
 @mcp.tool()
-def list_schemas(catalog: str) -> list:
+async def list_schemas(catalog: str, ctx: Context) -> list:
     """List all schemas in a given Databricks catalog."""
-    return databricks.list_schemas(catalog)
+    databricks = await _client_for(ctx)
+    return await asyncio.to_thread(databricks.list_schemas, catalog)
 
 @mcp.tool()
-def list_tables(catalog: str, schema: str) -> list:
+async def list_tables(catalog: str, schema: str, ctx: Context) -> list:
     """List all tables in a given Databricks schema."""
-    return databricks.list_tables(catalog, schema)
+    databricks = await _client_for(ctx)
+    return await asyncio.to_thread(databricks.list_tables, catalog, schema)
 
 @mcp.tool()
-def describe_table(catalog: str, schema: str, table: str) -> dict:
+async def describe_table(catalog: str, schema: str, table: str, ctx: Context) -> dict:
     """Describe the schema of a given Databricks table."""
-    return databricks.describe_table(catalog, schema, table)
+    databricks = await _client_for(ctx)
+    return await asyncio.to_thread(databricks.describe_table, catalog, schema, table)
+
+@mcp.tool()
+async def list_tables_bulk(catalog: str, schemas: list, ctx: Context) -> dict:
+    """List all tables in several Databricks schemas at once, keyed by schema."""
+    databricks = await _client_for(ctx)
+    return await asyncio.to_thread(databricks.list_tables_bulk, catalog, schemas)
+
+@mcp.tool()
+async def describe_tables_bulk(catalog: str, schema: str, tables: list, ctx: Context) -> dict:
+    """Describe several Databricks tables in a schema at once, keyed by table."""
+    databricks = await _client_for(ctx)
+    return await asyncio.to_thread(databricks.describe_tables_bulk, catalog, schema, tables)
 
 @mcp.tool()
-def create_schema(catalog: str, schema: str):
+async def create_schema(catalog: str, schema: str, ctx: Context):
     """Create a new schema in a given Databricks catalog."""
-    databricks.create_schema(catalog, schema)
+    databricks = await _client_for(ctx)
+    await asyncio.to_thread(databricks.create_schema, catalog, schema)
 
 @mcp.tool()
-def create_table(catalog: str, schema: str, table: str, columns: list):
+async def create_table(catalog: str, schema: str, table: str, columns: list, ctx: Context):
     """Create a new table in Databricks with specified columns."""
-    databricks.create_table(catalog, schema, table, columns)
+    databricks = await _client_for(ctx)
+    await asyncio.to_thread(databricks.create_table, catalog, schema, table, columns)
 
 @mcp.tool()
-def insert_data(table_full_name: str, values: list):
+async def insert_data(table_full_name: str, values: list, ctx: Context):
     """Insert data into a Databricks table."""
-    databricks.insert_data(table_full_name, values)
+    databricks = await _client_for(ctx)
+    await asyncio.to_thread(databricks.insert_data, table_full_name, values)
 
 if __name__ == "__main__":
     mcp.run()
@@ -1,20 +1,34 @@
+import asyncio
+import base64
+import tempfile
 import unittest
 import time
 import os
-from dotenv import load_dotenv
-from main import DatabricksMCP  # Import from main.py (or save DatabricksMCP separately if preferred)
+from unittest import mock
+import diskcache
+import httpx
+import orjson
+import pyarrow as pa
+from databricks.sdk.service.catalog import ColumnInfo, TableInfo
+from databricks.sdk.service.sql import (
+    ColumnInfo as ResultColumnInfo, ColumnInfoTypeName, ExternalLink, ResultData, ResultManifest, ResultSchema,
+    StatementResponse, StatementState, StatementStatus
+)
+import main
+from main import INLINE_BYTE_LIMIT, INSERT_TEMPLATE_CACHE_SIZE, DatabricksMCP, StatementReaper  # Import from main.py (or save DatabricksMCP separately if preferred)
 
-load_dotenv()
+# Importing main has already loaded .env into os.environ
 
 class TestDatabricksMCP(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         """Set up test data: create a schema, table, and insert rows."""
-        token = os.getenv("DATABRICKS_TOKEN")
-        host = os.getenv("DATABRICKS_HOST")
-        warehouse_id = os.getenv("DATABRICKS_WAREHOUSE_ID")
-        if not all([host, token, warehouse_id]):
-            raise ValueError("Missing required environment variables for tests")
+        for name in ("DATABRICKS_TOKEN", "DATABRICKS_HOST", "DATABRICKS_WAREHOUSE_ID"):
+            if not os.environ.get(name):
+                raise ValueError(f"Missing required environment variable for tests: {name}")
+        token = os.environ["DATABRICKS_TOKEN"]
+        host = os.environ["DATABRICKS_HOST"]
+        warehouse_id = os.environ["DATABRICKS_WAREHOUSE_ID"]
         cls.databricks = DatabricksMCP(host, token, warehouse_id)
         
         # Use an existing catalog (e.g., "main")
@@ -45,6 +59,57 @@ class TestDatabricksMCP(unittest.TestCase):
         self.assertEqual(rows[0][1], "Alice", "First row name should be Alice")
         self.assertEqual(rows[1][1], "Bob", "Second row name should be Bob")
 
+    def test_insert_data_round_trips_special_values(self):
+        """Test that quotes, backslashes, NULLs and booleans survive insert_data unchanged."""
+        table = "special_values"
+        columns = [
+            {"name": "id", "type": "INT"},
+            {"name": "name", "type": "STRING"},
+            {"name": "flag", "type": "BOOLEAN"}
+        ]
+        self.databricks.create_table(self.catalog, self.schema, table, columns)
+        values = [(3, "O'Neil", True), (4, None, False), (5, "back\\slash", None)]
+        self.databricks.insert_data(f"{self.catalog}.{self.schema}.{table}", values)
+        rows = self.databricks.execute_sql_query(f"SELECT * FROM {self.catalog}.{self.schema}.{table} ORDER BY id")
+        self.assertEqual(rows, values, "Inserted values should round-trip unchanged")
+
+    def test_execute_sql_query_prefer_arrow(self):
+        """Test that the inline and Arrow result paths return the same rows."""
+        sql = f"SELECT * FROM {self.catalog}.{self.schema}.{self.table} ORDER BY id"
+        inline_rows = self.databricks.execute_sql_query(sql)
+        arrow_rows = self.databricks.execute_sql_query(sql, prefer_arrow=True)
+        self.assertEqual(inline_rows, arrow_rows, "Both result paths should agree")
+
+    def test_execute_sql_query_prefer_arrow_scalar_types(self):
+        """Test that both result paths convert non-string scalar types the same way."""
+        sql = (
+            "SELECT DATE'2024-02-29' AS d, TIMESTAMP'2024-02-29 12:34:56.789 UTC' AS ts,"
+            " CAST(12.34 AS DECIMAL(10, 2)) AS dec, true AS flag, CAST(1.5 AS DOUBLE) AS dbl, CAST(1.1 AS FLOAT) AS flt,"
+            " CAST('bytes' AS BINARY) AS bin, ARRAY(1, 2) AS arr, NAMED_STRUCT('a', 1) AS st"
+        )
+        inline_rows = self.databricks.execute_sql_query(sql)
+        arrow_rows = self.databricks.execute_sql_query(sql, prefer_arrow=True)
+        self.assertEqual(inline_rows, arrow_rows, "Both result paths should agree")
+
+    def test_iter_sql_query(self):
+        """Test streaming the rows of a SQL query."""
+        sql = f"SELECT name FROM {self.catalog}.{self.schema}.{self.table} ORDER BY id"
+        names = [row[0] for row in self.databricks.iter_sql_query(sql)]
+        self.assertEqual(names, ["Alice", "Bob"], "Rows should stream in order")
+
+    def test_execute_sql_query_async(self):
+        """Test executing a SQL query without blocking the event loop."""
+        sql = f"SELECT * FROM {self.catalog}.{self.schema}.{self.table}"
+        rows = asyncio.run(self.databricks.execute_sql_query_async(sql))
+        self.assertEqual(len(rows), 2, "Should have two rows")
+        self.assertEqual(rows[0][1], "Alice", "First row name should be Alice")
+
+    def test_execute_sql_query_async_prefer_arrow(self):
+        """Test that the async Arrow path returns the same rows as the sync one."""
+        sql = f"SELECT * FROM {self.catalog}.{self.schema}.{self.table} ORDER BY id"
+        rows = asyncio.run(self.databricks.execute_sql_query_async(sql, prefer_arrow=True))
+        self.assertEqual(rows, self.databricks.execute_sql_query(sql), "Both paths should agree")
+
     def test_list_schemas(self):
         """Test listing schemas in the catalog."""
         schemas = self.databricks.list_schemas(self.catalog)
@@ -55,11 +120,338 @@ class TestDatabricksMCP(unittest.TestCase):
         tables = self.databricks.list_tables(self.catalog, self.schema)
         self.assertIn(self.table, tables, "Test table should be listed")
 
+    def test_create_table_refreshes_cached_tables(self):
+        """Test that creating a table invalidates the cached table listing."""
+        self.databricks.list_tables(self.catalog, self.schema)  # Populate the cache
+        self.databricks.create_table(self.catalog, self.schema, "cache_table", [{"name": "id", "type": "INT"}])
+        tables = self.databricks.list_tables(self.catalog, self.schema)
+        self.assertIn("cache_table", tables, "Newly created table should be listed")
+
+    def test_list_tables_bulk(self):
+        """Test listing tables across several schemas at once."""
+        tables = self.databricks.list_tables_bulk(self.catalog, [self.schema])
+        self.assertIn(self.table, tables[self.schema], "Test table should be listed under its schema")
+
     def test_describe_table(self):
         """Test describing the table structure."""
         description = self.databricks.describe_table(self.catalog, self.schema, self.table)
         self.assertEqual(description["columns"], ["id", "name"], "Columns should match")
         self.assertEqual(description["data_types"], ["INT", "STRING"], "Data types should match")
 
+    def test_describe_tables_bulk(self):
+        """Test describing several tables at once."""
+        descriptions = self.databricks.describe_tables_bulk(self.catalog, self.schema, [self.table])
+        self.assertEqual(descriptions[self.table]["columns"], ["id", "name"], "Columns should match")
+
+class TestDatabricksMCPOffline(unittest.TestCase):
+    """Tests for client-side behaviour, using a mocked WorkspaceClient."""
+
+    def setUp(self):
+        for target in ("main.WorkspaceClient", "main.Config"):
+            patcher = mock.patch(target)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Keep the on-disk description cache in a throwaway directory
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        cache = diskcache.Cache(cache_dir.name)
+        self.addCleanup(cache.close)
+        patcher = mock.patch("main._describe_cache", return_value=cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.databricks = DatabricksMCP("https://example.cloud.databricks.com", "token", "warehouse")
+        self.databricks.client.tables.get.return_value = TableInfo(
+            columns=[ColumnInfo(name="id", type_text="int")]
+        )
+        self.databricks.client.statement_execution.execute_statement.return_value = StatementResponse(
+            statement_id="s", status=StatementStatus(state=StatementState.SUCCEEDED)
+        )
+
+    def test_describe_table_uses_disk_cache_across_clients(self):
+        """Test that a description cached by one client is served to a new one without an API call."""
+        tables_get = self.databricks.client.tables.get
+        self.databricks.describe_table("c", "s", "t")
+        restarted = DatabricksMCP("https://example.cloud.databricks.com", "token", "warehouse")
+        description = restarted.describe_table("c", "s", "t")
+        self.assertEqual(description, {"columns": ["id"], "data_types": ["INT"]})
+        self.assertEqual(tables_get.call_count, 1, "The second client should be served from disk")
+
+    def test_describe_table_disk_cache_is_per_token(self):
+        """Test that other credentials on the same host do not see cached descriptions."""
+        tables_get = self.databricks.client.tables.get
+        self.databricks.describe_table("c", "s", "t")
+        DatabricksMCP("https://example.cloud.databricks.com", "other-token", "warehouse").describe_table("c", "s", "t")
+        self.assertEqual(tables_get.call_count, 2, "Another token should not hit this token's entries")
+
+    def test_ddl_invalidates_cached_descriptions(self):
+        """Test that DDL run through execute_sql_query drops in-memory and on-disk descriptions."""
+        tables_get = self.databricks.client.tables.get
+        self.databricks.describe_table("c", "s", "t")
+        self.databricks.execute_sql_query("SELECT 1")
+        self.databricks.describe_table("c", "s", "t")
+        self.assertEqual(tables_get.call_count, 1, "Queries should not invalidate the cache")
+        self.databricks.execute_sql_query("ALTER TABLE c.s.t ADD COLUMN name STRING")
+        self.databricks.describe_table("c", "s", "t")
+        restarted = DatabricksMCP("https://example.cloud.databricks.com", "token", "warehouse")
+        restarted.describe_table("c", "s", "t")
+        self.assertEqual(tables_get.call_count, 2, "DDL should force one fresh lookup, then re-cache it")
+
+    def test_execute_sql_query_falls_back_to_arrow_when_truncated(self):
+        """Test that an inline result cut off at the byte limit is re-fetched as Arrow."""
+        execute_statement = self.databricks.client.statement_execution.execute_statement
+        execute_statement.return_value = StatementResponse(
+            statement_id="s", status=StatementStatus(state=StatementState.SUCCEEDED),
+            manifest=ResultManifest(truncated=True, total_row_count=10)
+        )
+        self.databricks.fetch_arrow = mock.Mock(return_value=None)
+        self.databricks.execute_sql_query("SELECT * FROM wide_table")
+        self.assertEqual(execute_statement.call_args.kwargs["byte_limit"], INLINE_BYTE_LIMIT)
+        self.databricks.fetch_arrow.assert_called_once_with("SELECT * FROM wide_table", None)
+
+    def test_execute_sql_query_async_prefer_arrow(self):
+        """Test that the async Arrow path downloads every chunk and keeps their order."""
+        chunks = {
+            "https://files/0": pa.table({"id": [1, 2], "name": ["Alice", "Bob"]}),
+            "https://files/1": pa.table({"id": [3], "name": ["Carol"]}),
+        }
+
+        def handler(request):
+            self.assertEqual(request.headers["x-chunk"], "signed", "Presigned headers should be sent")
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, chunks[str(request.url)].schema) as writer:
+                writer.write_table(chunks[str(request.url)])
+            return httpx.Response(200, content=sink.getvalue().to_pybytes())
+
+        self.databricks.client.statement_execution.execute_statement.return_value = StatementResponse(
+            statement_id="s", status=StatementStatus(state=StatementState.SUCCEEDED),
+            result=ResultData(external_links=[
+                ExternalLink(external_link=url, http_headers={"x-chunk": "signed"}) for url in chunks
+            ])
+        )
+        with mock.patch("main.httpx.AsyncHTTPTransport", return_value=httpx.MockTransport(handler)):
+            rows = asyncio.run(self.databricks.execute_sql_query_async("SELECT * FROM t", prefer_arrow=True))
+        self.assertEqual(rows, [(1, "Alice"), (2, "Bob"), (3, "Carol")], "Chunks should be concatenated in order")
+
+    def test_inline_float_matches_arrow_float32(self):
+        """Test that inline FLOAT values are rounded to single precision as Arrow's float32 is."""
+        self.databricks.client.statement_execution.execute_statement.return_value = StatementResponse(
+            statement_id="s", status=StatementStatus(state=StatementState.SUCCEEDED),
+            manifest=ResultManifest(total_row_count=1, schema=ResultSchema(columns=[
+                ResultColumnInfo(name="flt", type_name=ColumnInfoTypeName.FLOAT),
+            ])),
+            result=ResultData(data_array=[["1.1"]])
+        )
+        rows = self.databricks.execute_sql_query("SELECT CAST(1.1 AS FLOAT)")
+        self.assertEqual(rows, [(pa.array([1.1], pa.float32()).to_pylist()[0],)])
+
+    def test_sync_timeout_cancels_the_statement(self):
+        """Test that a statement abandoned after POLL_TIMEOUT is cancelled on the warehouse."""
+        statement_execution = self.databricks.client.statement_execution
+        statement_execution.execute_statement.return_value = _statement("s", StatementState.RUNNING)
+        statement_execution.get_statement.return_value = _statement("s", StatementState.RUNNING)
+        with mock.patch("main.POLL_TIMEOUT", 0.05), self.assertRaises(Exception):
+            self.databricks.execute_sql_query("SELECT slow()")
+        statement_execution.cancel_execution.assert_called_once_with("s")
+
+    def test_async_queries_are_polled_by_the_reaper(self):
+        """Test that async statements skip the server-side wait and are resolved by the shared poller."""
+        statement_execution = self.databricks.client.statement_execution
+        statement_execution.execute_statement.return_value = _statement("s", StatementState.PENDING)
+        statement_execution.get_statement.return_value = _statement("s", StatementState.SUCCEEDED)
+        rows = asyncio.run(self.databricks.execute_sql_query_async("SELECT 1"))
+        self.assertEqual(rows, [], "A result without a manifest has no rows")
+        self.assertEqual(statement_execution.execute_statement.call_args.kwargs["wait_timeout"], "0s")
+        statement_execution.get_statement.assert_called_with("s")
+
+    def test_binary_values_stay_base64_on_both_paths(self):
+        """Test that non-UTF-8 binary values come back as JSON-serializable base64 text."""
+        raw = b"\xff\x00"
+        encoded = base64.b64encode(raw).decode("ascii")
+        self.databricks.client.statement_execution.execute_statement.return_value = StatementResponse(
+            statement_id="s", status=StatementStatus(state=StatementState.SUCCEEDED),
+            manifest=ResultManifest(total_row_count=1, schema=ResultSchema(columns=[
+                ResultColumnInfo(name="id", type_name=ColumnInfoTypeName.INT),
+                ResultColumnInfo(name="bin", type_name=ColumnInfoTypeName.BINARY),
+            ])),
+            result=ResultData(data_array=[["1", encoded]])
+        )
+        inline_rows = self.databricks.execute_sql_query("SELECT 1, X'FF00'")
+        arrow_table = pa.table({"id": [1], "bin": pa.array([raw], pa.binary())})
+        self.databricks.fetch_arrow = mock.Mock(return_value=arrow_table)
+        arrow_rows = self.databricks.execute_sql_query("SELECT 1, X'FF00'", prefer_arrow=True)
+        self.assertEqual(inline_rows, [(1, encoded)], "Inline binary should stay base64")
+        self.assertEqual(arrow_rows, inline_rows, "Arrow binary should be encoded the same way")
+        orjson.dumps(arrow_rows)  # Raw non-UTF-8 bytes would not serialize
+
+    def test_insert_templates_are_bounded(self):
+        """Test that the INSERT template cache is reused for repeated shapes and stays bounded."""
+        self.databricks.execute_sql_no_result = mock.Mock()
+        self.databricks.insert_data("c.s.t", [(1, "a")] * 5, page_size=2)  # Pages of 2, 2 and 1 rows
+        self.assertEqual(len(self.databricks._insert_templates), 2, "Full pages should share one template")
+        for nrows in range(1, INSERT_TEMPLATE_CACHE_SIZE + 10):
+            self.databricks.insert_data("c.s.t", [(1, "a")] * nrows, page_size=500)
+        self.assertLessEqual(len(self.databricks._insert_templates), INSERT_TEMPLATE_CACHE_SIZE)
+
+def _context(headers: dict = None):
+    """Build a tool call context; headers=None stands for the stdio transport, which has no request."""
+    ctx = mock.Mock()
+    ctx.request_context.request = None if headers is None else mock.Mock(headers=headers)
+    return ctx
+
+class TestClientResolution(unittest.TestCase):
+    """Tests for per-request client selection, using a mocked WorkspaceClient."""
+
+    def setUp(self):
+        for patcher in (
+            mock.patch("main.WorkspaceClient"),
+            mock.patch("main.Config"),
+            mock.patch.dict(main._CLIENTS, clear=True),
+            mock.patch.dict(main._PENDING_CLIENTS, clear=True),
+            mock.patch("main.ALLOWED_HOSTS", frozenset({
+                "https://example.cloud.databricks.com", "https://other.databricks.com"
+            })),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_get_client_is_cached_per_credentials(self):
+        """Test that the same credentials reuse one client and a different token gets its own."""
+        first = main.get_client("https://example.cloud.databricks.com", "token", "warehouse")
+        again = main.get_client("https://example.cloud.databricks.com", "token", "warehouse")
+        other = main.get_client("https://example.cloud.databricks.com", "other-token", "warehouse")
+        self.assertIs(first, again, "Identical credentials should share a client")
+        self.assertIsNot(first, other, "A different token should get its own client")
+
+    def test_stdio_falls_back_to_environment(self):
+        """Test that a call without an HTTP request uses the configured credentials."""
+        client = asyncio.run(main._client_for(_context()))
+        self.assertIs(client, main.get_client(main._normalize_host(main.host), main.token, main.warehouse_id))
+
+    def test_token_header_overrides_only_the_token(self):
+        """Test that a token-only header keeps the configured host and warehouse."""
+        client = asyncio.run(main._client_for(_context({"x-databricks-token": "caller-token"})))
+        self.assertIs(client, main.get_client(main._normalize_host(main.host), "caller-token", main.warehouse_id))
+
+    def test_allowed_host_header_is_used(self):
+        """Test that spellings of an allowlisted host are accepted and share one normalized client."""
+        headers = {"x-databricks-host": "HTTPS://Other.Databricks.com/", "x-databricks-token": "caller-token"}
+        client = asyncio.run(main._client_for(_context(headers)))
+        headers["x-databricks-host"] = "other.databricks.com"
+        self.assertIs(asyncio.run(main._client_for(_context(headers))), client, "Spellings should share a client")
+        self.assertEqual(client._identity[0], "https://other.databricks.com")
+
+    def test_host_header_without_token_is_rejected(self):
+        """Test that the server's own token is never sent to a caller-chosen host."""
+        with self.assertRaises(ValueError):
+            asyncio.run(main._client_for(_context({"x-databricks-host": "https://other.databricks.com"})))
+        self.assertEqual(len(main._CLIENTS), 0, "No client should be created")
+
+    def test_host_header_outside_allowlist_is_rejected(self):
+        """Test that hosts outside ALLOWED_HOSTS are refused even with a token."""
+        headers = {"x-databricks-host": "https://attacker.example.com", "x-databricks-token": "caller-token"}
+        with self.assertRaises(ValueError):
+            asyncio.run(main._client_for(_context(headers)))
+        self.assertEqual(len(main._CLIENTS), 0, "No client should be created")
+
+    def test_cached_lookup_is_not_blocked_by_slow_creations(self):
+        """Test that a cached client is returned while new clients saturate the init pool."""
+        cached = main.get_client(main._normalize_host(main.host), main.token, main.warehouse_id)
+
+        def slow_client(*args):
+            time.sleep(0.5)
+            return mock.Mock()
+
+        async def lookups():
+            slow = [
+                asyncio.create_task(main._client_for(_context({"x-databricks-token": f"slow-{i}"})))
+                for i in range(main._CLIENT_INIT_EXECUTOR._max_workers)
+            ]
+            await asyncio.sleep(0.05)  # Let the slow creations occupy every init thread
+            client = await main._client_for(_context())
+            await asyncio.gather(*slow, return_exceptions=True)
+            return client
+
+        with mock.patch("main.CLIENT_INIT_TIMEOUT", 0.2), mock.patch("main.DatabricksMCP", side_effect=slow_client):
+            self.assertIs(asyncio.run(lookups()), cached, "The cached client should not wait on the init pool")
+
+    def test_concurrent_creations_are_shared(self):
+        """Test that simultaneous calls with the same new credentials build a single client."""
+        async def lookups():
+            ctx = _context({"x-databricks-token": "caller-token"})
+            return await asyncio.gather(main._client_for(ctx), main._client_for(ctx))
+
+        with mock.patch("main.DatabricksMCP", side_effect=lambda *args: time.sleep(0.1) or mock.Mock()) as factory:
+            first, second = asyncio.run(lookups())
+        self.assertIs(first, second, "Both callers should get the same client")
+        self.assertEqual(factory.call_count, 1, "The client should be created once")
+
+    def test_slow_client_creation_times_out(self):
+        """Test that a client whose configuration hangs fails after CLIENT_INIT_TIMEOUT."""
+        with mock.patch("main.CLIENT_INIT_TIMEOUT", 0.05), \
+                mock.patch("main.get_client", side_effect=lambda *args: time.sleep(0.5)):
+            with self.assertRaises(TimeoutError):
+                asyncio.run(main._client_for(_context()))
+
+def _statement(statement_id: str, state: StatementState) -> StatementResponse:
+    """Build a statement response in the given state."""
+    return StatementResponse(statement_id=statement_id, status=StatementStatus(state=state))
+
+class TestStatementReaper(unittest.TestCase):
+    """Tests for the shared poller, using a mocked statement execution API."""
+
+    def setUp(self):
+        self.client = mock.MagicMock()
+        self.reaper = StatementReaper(self.client, tick=0.01)
+
+    def test_resolves_concurrent_statements(self):
+        """Test that statements finishing on different polls all resolve."""
+        polls = {"a": [StatementState.SUCCEEDED], "b": [StatementState.RUNNING, StatementState.SUCCEEDED]}
+        self.client.statement_execution.get_statement.side_effect = lambda sid: _statement(sid, polls[sid].pop(0))
+
+        async def wait_all():
+            return await asyncio.gather(self.reaper.wait("a"), self.reaper.wait("b"))
+
+        responses = asyncio.run(wait_all())
+        self.assertEqual([r.statement_id for r in responses], ["a", "b"], "Both statements should resolve")
+        self.assertEqual(polls, {"a": [], "b": []}, "Each poll result should be consumed")
+
+    def test_timeout_cancels_the_statement(self):
+        """Test that a statement the caller stops waiting for is cancelled on the warehouse."""
+        self.client.statement_execution.get_statement.side_effect = lambda sid: _statement(sid, StatementState.RUNNING)
+        with self.assertRaises(Exception):
+            asyncio.run(self.reaper.wait("slow", timeout=0.05))
+        self.client.statement_execution.cancel_execution.assert_called_once_with("slow")
+
+    def test_cancelled_wait_cancels_the_statement(self):
+        """Test that cancelling the waiting task also cancels the statement."""
+        self.client.statement_execution.get_statement.side_effect = lambda sid: _statement(sid, StatementState.RUNNING)
+
+        async def cancel_wait():
+            task = asyncio.create_task(self.reaper.wait("slow"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_wait())
+        self.client.statement_execution.cancel_execution.assert_called_once_with("slow")
+
+    def test_malformed_response_fails_only_its_statement(self):
+        """Test that a response without a status fails its own wait without stalling the others."""
+        def get_statement(sid):
+            if sid == "bad":
+                return StatementResponse(statement_id=sid)  # No status
+            return _statement(sid, StatementState.SUCCEEDED)
+        self.client.statement_execution.get_statement.side_effect = get_statement
+
+        async def wait_all():
+            return await asyncio.gather(
+                self.reaper.wait("bad", timeout=5), self.reaper.wait("good", timeout=5), return_exceptions=True
+            )
+
+        bad, good = asyncio.run(wait_all())
+        self.assertIsInstance(bad, AttributeError, "The malformed statement should fail")
+        self.assertEqual(good.statement_id, "good", "The other statement should still resolve")
+
 if __name__ == "__main__":
     unittest.main()